@@ -1,84 +1,160 @@
 """Benchmark registry: download and manage benchmark instance sets."""
 
 import bz2
-import json
+import functools
 import lzma
+import os
+import shutil
 import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from glob import glob as globfn
 
+from lib.download_cache import clone_repo
+from lib.registries import benchmark_registry
+
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 BENCHMARKS_DIR = BASE_DIR / "benchmarks"
-CONFIG_FILE = BASE_DIR / "config" / "benchmarks.json"
+CONFIG_FILE = benchmark_registry.config_file
+INSTANCE_INDEX = ".instance_index.txt"
 
 
 def load_benchmarks():
-    with open(CONFIG_FILE) as f:
-        return json.load(f)
+    return benchmark_registry.entries()
 
 
 def get_benchmark(name):
-    for b in load_benchmarks():
-        if b["name"] == name:
-            return b
-    raise ValueError(f"Unknown benchmark: {name}")
+    return benchmark_registry.get(name)
 
 
 def benchmark_dir(name):
     return BENCHMARKS_DIR / name
 
 
+@functools.lru_cache(maxsize=1)
+def _list_dir(mtime_ns):
+    return frozenset(os.listdir(BENCHMARKS_DIR))
+
+
+def _installed_names():
+    """Names present in benchmarks/, listed once per directory version."""
+    try:
+        return _list_dir(BENCHMARKS_DIR.stat().st_mtime_ns)
+    except FileNotFoundError:
+        return frozenset()
+
+
 def is_installed(name):
-    return benchmark_dir(name).exists()
+    return name in _installed_names()
+
+
+# Suffix -> (native command, stdlib opener). The native tool is used when
+# it is on PATH; the stdlib module is the fallback. Files are already
+# decompressed in parallel, so each tool runs single-threaded.
+_DECOMPRESSORS = {
+    ".xz": (["xz", "-d", "-k", "-T1"], lzma.open),
+    ".bz2": (["lbzip2", "-d", "-k", "-n", "1"], bz2.open),
+}
+
+# One pool shared by all downloads, so concurrent benchmark setups never
+# run more than one decompression per CPU between them. Threads suffice:
+# the work happens in xz/lbzip2 subprocesses or in lzma/bz2 code that
+# releases the GIL.
+_decompress_pool = None
+_decompress_pool_lock = threading.Lock()
+
+# Typical decompressed/compressed size ratio of .gr edge lists, used to
+# preallocate the output of the stdlib fallback.
+_GR_EXPANSION_RATIO = 4
+
+
+def _decompress_one(path):
+    """Decompress a single .gr.xz or .gr.bz2 file next to the original."""
+    gr_path = path.with_suffix("")
+    command, opener = _DECOMPRESSORS[path.suffix]
+    if shutil.which(command[0]):
+        proc = subprocess.run(
+            command + [str(path)],
+            capture_output=True,
+            text=True,
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(proc.stderr.strip())
+        return gr_path
+    try:
+        with opener(path, "rb") as fin:
+            with open(gr_path, "wb") as fout:
+                _preallocate(fout, path.stat().st_size * _GR_EXPANSION_RATIO)
+                shutil.copyfileobj(fin, fout, 1 << 20)
+                # Drop whatever part of the estimate was not used
+                fout.truncate()
+    except BaseException:
+        # Never leave a partial .gr behind; it would be taken as done
+        gr_path.unlink(missing_ok=True)
+        raise
+    return gr_path
+
+
+def _preallocate(f, size):
+    """Reserve size bytes for f up front (best effort, Linux/BSD only)."""
+    if size <= 0 or not hasattr(os, "posix_fallocate"):
+        return
+    try:
+        os.posix_fallocate(f.fileno(), 0, size)
+    except OSError:
+        pass
 
 
-def _decompress_files(dest):
-    """Decompress all .gr.xz and .gr.bz2 files to .gr."""
+def _get_decompress_pool():
+    global _decompress_pool
+    with _decompress_pool_lock:
+        if _decompress_pool is None:
+            _decompress_pool = ThreadPoolExecutor(max_workers=os.cpu_count())
+        return _decompress_pool
+
+
+def _decompress_files(name, dest):
+    """Decompress all .gr.xz and .gr.bz2 files of benchmark name to .gr."""
+    # One walk classifies both suffixes; Path objects are only built for
+    # the files that actually need decompressing.
+    pending = []
+    for root, _, files in os.walk(dest):
+        names = set(files)
+        for fname in files:
+            if fname.endswith((".gr.xz", ".gr.bz2")):
+                if fname.rsplit(".", 1)[0] not in names:
+                    pending.append(Path(root, fname))
+    if not pending:
+        return 0
     count = 0
-    for xz_path in dest.rglob("*.gr.xz"):
-        gr_path = xz_path.with_suffix("")
-        if gr_path.exists():
-            continue
-        try:
-            with lzma.open(xz_path, "rb") as fin:
-                with open(gr_path, "wb") as fout:
-                    fout.write(fin.read())
-            count += 1
-        except Exception as e:
-            print(f"    Warning: failed to decompress {xz_path.name}: {e}")
-    for bz2_path in dest.rglob("*.gr.bz2"):
-        gr_path = bz2_path.with_suffix("")
-        if gr_path.exists():
-            continue
+    pool = _get_decompress_pool()
+    futures = {pool.submit(_decompress_one, path): path for path in pending}
+    for future in as_completed(futures):
         try:
-            with bz2.open(bz2_path, "rb") as fin:
-                with open(gr_path, "wb") as fout:
-                    fout.write(fin.read())
+            future.result()
             count += 1
         except Exception as e:
-            print(f"    Warning: failed to decompress {bz2_path.name}: {e}")
+            print(f"  [{name}] Warning: failed to decompress {futures[future].name}: {e}")
     if count:
-        print(f"  Decompressed {count} compressed files")
+        print(f"  [{name}] Decompressed {count} compressed files")
+        list_instances.cache_clear()
     return count
 
 
-def download_benchmark(bench):
+def download_benchmark(bench, cache_dir=None):
     name = bench["name"]
     dest = benchmark_dir(name)
     if dest.exists():
         print(f"  [{name}] Already downloaded, skipping clone")
-        _decompress_files(dest)
+        _decompress_files(name, dest)
         return True
     print(f"  [{name}] Cloning {bench['repo']} ...")
     try:
-        subprocess.run(
-            ["git", "clone", "--depth", "1", bench["repo"], str(dest)],
-            check=True,
-            capture_output=True,
-            text=True,
-        )
-        _decompress_files(dest)
+        clone_repo(bench["repo"], dest, cache_dir)
+        list_instances.cache_clear()
+        _decompress_files(name, dest)
         return True
     except subprocess.CalledProcessError as e:
         print(f"  [{name}] Clone failed: {e.stderr.strip()}")
@@ -95,19 +171,85 @@ def setup_all():
     return results
 
 
+def _directory_stamps(dest):
+    """(relative dir, mtime_ns) for dest and every non-hidden directory below it.
+
+    Adding, removing or renaming an instance changes its directory's mtime.
+    Hidden directories such as .git are skipped, as glob's ** skips them.
+    """
+    stamps = []
+    for root, dirs, _ in os.walk(dest):
+        dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+        stamps.append((os.path.relpath(root, dest), os.stat(root).st_mtime_ns))
+    return stamps
+
+
+def _read_instance_index(index, dest, glob_pattern):
+    """Instance paths from index, or None if it is missing or stale.
+
+    Layout: "<glob>\t<file count>", one "<mtime_ns>\t<dir>" line per
+    directory, a blank line, then the instance paths relative to dest.
+    """
+    try:
+        with open(index) as f:
+            data = f.read()
+        if not data.endswith("\n"):
+            return None  # cut short by an interrupted write
+        lines = data.splitlines()
+        sep = lines.index("")
+        pattern, _, count = lines[0].rpartition("\t")
+        if pattern != glob_pattern or int(count) != len(lines) - sep - 1:
+            return None
+        for line in lines[1:sep]:
+            mtime, rel = line.split("\t", 1)
+            if os.stat(dest / rel).st_mtime_ns != int(mtime):
+                return None
+    except (OSError, ValueError):
+        return None
+    return tuple(str(dest / rel) for rel in lines[sep + 1 :])
+
+
+@functools.lru_cache(maxsize=None)
 def list_instances(name):
-    """List all .gr files in a benchmark set."""
+    """List all .gr files in a benchmark set.
+
+    The sorted glob result is kept in an on-disk index
+    (benchmarks/<name>/.instance_index.txt) that is reused while the glob
+    pattern and the mtimes of all directories in the set are unchanged.
+    """
     bench = get_benchmark(name)
     dest = benchmark_dir(name)
     if not dest.exists():
-        return []
-    pattern = str(dest / bench.get("glob", "**/*.gr"))
-    files = sorted(globfn(pattern, recursive=True))
+        return ()
+    glob_pattern = bench.get("glob", "**/*.gr")
+    index = dest / INSTANCE_INDEX
+    files = _read_instance_index(index, dest, glob_pattern)
+    if files is not None:
+        return files
+    try:
+        f = open(index, "w")
+    except OSError:
+        f = None
+    # Stamp only once the index file exists (creating it changes dest's
+    # mtime) and before globbing, so any change made during the glob
+    # invalidates the index on the next call.
+    stamps = _directory_stamps(dest)
+    files = tuple(sorted(globfn(str(dest / glob_pattern), recursive=True)))
+    if f is not None:
+        try:
+            with f:
+                f.write(f"{glob_pattern}\t{len(files)}\n")
+                f.writelines(f"{mtime}\t{rel}\n" for rel, mtime in stamps)
+                f.write("\n")
+                f.writelines(os.path.relpath(path, dest) + "\n" for path in files)
+        except OSError:
+            pass
     return files
 
 
 def list_installed():
-    return [b["name"] for b in load_benchmarks() if is_installed(b["name"])]
+    installed = _installed_names()
+    return [b["name"] for b in load_benchmarks() if b["name"] in installed]
 
 
 def count_instances(name):
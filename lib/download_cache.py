@@ -0,0 +1,61 @@
+"""Download cache: shallow git clones shared by the solver and benchmark registries."""
+
+import hashlib
+import os
+import shutil
+import subprocess
+from pathlib import Path
+
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_CACHE_DIR = BASE_DIR / ".download_cache"
+CACHE_ENV_VAR = "TW_SETUP_CACHE"
+
+
+def cache_enabled_by_env():
+    """True when TW_SETUP_CACHE is set to a non-empty, non-"0" value."""
+    return os.environ.get(CACHE_ENV_VAR, "") not in ("", "0")
+
+
+def _git_clone(repo, dest):
+    subprocess.run(
+        ["git", "clone", "--depth", "1", repo, str(dest)],
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+
+
+def _clone_into(repo, dest):
+    """Clone into dest.part and rename it to dest once git has finished.
+
+    An interrupted clone therefore never shows up as dest (which callers
+    treat as "already downloaded"); its leftover .part is discarded on
+    the next attempt.
+    """
+    partial = dest.with_name(dest.name + ".part")
+    shutil.rmtree(partial, ignore_errors=True)
+    partial.parent.mkdir(parents=True, exist_ok=True)
+    _git_clone(repo, partial)
+    os.replace(partial, dest)
+
+
+def clone_repo(repo, dest, cache_dir=None):
+    """Shallow-clone repo into dest.
+
+    With a cache_dir, the clone is kept in cache_dir/<sha256(repo)>/<name>
+    and later calls copy it from there instead of going to the network.
+    Raises subprocess.CalledProcessError if git fails.
+    """
+    dest = Path(dest)
+    if cache_dir is None:
+        _clone_into(repo, dest)
+        return
+    key = hashlib.sha256(repo.encode()).hexdigest()
+    cached = Path(cache_dir) / key / Path(repo.rstrip("/")).name
+    if not cached.exists():
+        _clone_into(repo, cached)
+    partial = dest.with_name(dest.name + ".part")
+    shutil.rmtree(partial, ignore_errors=True)
+    shutil.copytree(cached, partial, symlinks=True)
+    os.replace(partial, dest)
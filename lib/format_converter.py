@@ -5,36 +5,73 @@ Supported formats:
   - quickbb_cnf: QuickBB CNF-like format
 """
 
+import gc
+import itertools
 from pathlib import Path
 
 
 def read_pace_gr(filepath):
-    """Read a PACE .gr file and return (n_vertices, edges)."""
+    """Read a PACE .gr file and return (n_vertices, edges).
+
+    edges is a tuple of (u, v) pairs.
+    """
+    # .gr files are plain ASCII; reading bytes skips the UTF-8 decode and
+    # int() accepts the bytes tokens directly.
+    with open(filepath, "rb") as f:
+        data = f.read()
+
+    # Walk the comment/header preamble line by line, then convert the
+    # edge list that follows in a single split() + int() pass.
     n = 0
-    m = 0
-    edges = []
-    with open(filepath) as f:
-        for line in f:
+    pos = 0
+    while pos < len(data):
+        end = data.find(b"\n", pos)
+        if end < 0:
+            end = len(data)
+        line = data[pos:end].strip()
+        if line and not line.startswith(b"c"):
+            if not line.startswith(b"p"):
+                break
+            n = int(line.split()[2])
+        pos = end + 1
+    body = data[pos:]
+
+    # Comment (or header) lines interleaved with edges: drop them first.
+    if b"c" in body or b"p" in body:
+        kept = []
+        for line in body.split(b"\n"):
             line = line.strip()
-            if not line or line.startswith("c"):
-                continue
-            if line.startswith("p"):
-                parts = line.split()
-                n = int(parts[2])
-                m = int(parts[3])
-            else:
-                parts = line.split()
-                u, v = int(parts[0]), int(parts[1])
-                edges.append((u, v))
+            if line.startswith(b"p"):
+                n = int(line.split()[2])
+            elif not line.startswith(b"c"):
+                kept.append(line)
+        body = b"\n".join(kept)
+
+    nums = list(map(int, body.split()))
+    if len(nums) % 2:
+        raise ValueError(f"Malformed edge list in {filepath}")
+    # Allocating millions of pair tuples otherwise triggers repeated,
+    # pointless cyclic-GC passes over them.
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        edges = tuple(zip(nums[0::2], nums[1::2]))
+    finally:
+        if gc_enabled:
+            gc.enable()
     return n, edges
 
 
+def _format_edges(edges, line_format):
+    """Render all edges with one %-format call instead of one per edge."""
+    return (line_format * len(edges)) % tuple(itertools.chain.from_iterable(edges))
+
+
 def write_pace_gr(filepath, n, edges):
     """Write a graph in PACE .gr format."""
     with open(filepath, "w") as f:
         f.write(f"p tw {n} {len(edges)}\n")
-        for u, v in edges:
-            f.write(f"{u} {v}\n")
+        f.write(_format_edges(edges, "%d %d\n"))
 
 
 def pace_gr_to_quickbb_cnf(input_path, output_path):
@@ -47,8 +84,7 @@ def pace_gr_to_quickbb_cnf(input_path, output_path):
     n, edges = read_pace_gr(input_path)
     with open(output_path, "w") as f:
         f.write(f"p cnf {n} {len(edges)}\n")
-        for u, v in edges:
-            f.write(f"{u} {v} 0\n")
+        f.write(_format_edges(edges, "%d %d 0\n"))
     return output_path
 
 
@@ -58,13 +94,37 @@ def get_graph_info(filepath):
     return {"vertices": n, "edges": len(edges)}
 
 
+def get_graph_info_fast(filepath):
+    """Get vertex/edge counts from the "p tw" header without reading edges.
+
+    Falls back to get_graph_info() for files without a header line.
+    """
+    with open(filepath) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("c"):
+                continue
+            if line.startswith("p"):
+                parts = line.split()
+                return {"vertices": int(parts[2]), "edges": int(parts[3])}
+            break
+    return get_graph_info(filepath)
+
+
 def parse_td_output(text):
     """Parse tree decomposition output (.td format) and extract treewidth.
 
     Returns dict with 'treewidth', 'n_bags', 'n_vertices' or None on failure.
+    Lines are sliced out one at a time, so only the text up to the first
+    match is touched, not the whole (possibly large) decomposition.
     """
-    for line in text.strip().split("\n"):
-        line = line.strip()
+    pos = 0
+    while pos < len(text):
+        end = text.find("\n", pos)
+        if end < 0:
+            end = len(text)
+        line = text[pos:end].strip()
+        pos = end + 1
         if line.startswith("s td"):
             parts = line.split()
             n_bags = int(parts[2])
@@ -0,0 +1,84 @@
+"""Lazy registries over the solver and benchmark configs.
+
+Listing or looking up entries only parses the JSON config. Setup actions
+are registered as "module:callable" strings and imported on first use, so
+e.g. `setup.py --list` never loads the download/build machinery.
+"""
+
+import functools
+import importlib
+import json
+import threading
+from pathlib import Path
+from types import MappingProxyType
+
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+CONFIG_DIR = BASE_DIR / "config"
+
+
+def _freeze(value):
+    """Read-only view of parsed JSON: dicts become mappingproxies, lists tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+class Registry:
+    def __init__(self, kind, config_file, actions):
+        self.kind = kind
+        self.config_file = config_file
+        self._placeholders = dict(actions)
+        self._actions = {}
+        self._lock = threading.Lock()
+        # Parsed once per config file version (keyed on its mtime)
+        self._load = functools.lru_cache(maxsize=1)(self._parse)
+
+    def _parse(self, mtime_ns):
+        # Entries are shared by every caller until the config changes, so
+        # hand out read-only views rather than mutable dicts.
+        entries = _freeze(json.loads(self.config_file.read_bytes()))
+        return entries, {e["name"]: e for e in entries}
+
+    def _config(self):
+        return self._load(self.config_file.stat().st_mtime_ns)
+
+    def entries(self):
+        """All config entries, in file order."""
+        return self._config()[0]
+
+    def keys(self):
+        return self._config()[1].keys()
+
+    def get(self, name):
+        try:
+            return self._config()[1][name]
+        except KeyError:
+            raise ValueError(f"Unknown {self.kind}: {name}") from None
+
+    def action(self, name):
+        """Return the callable registered as name, importing its module on first use."""
+        with self._lock:
+            if name not in self._actions:
+                module, _, attr = self._placeholders[name].partition(":")
+                self._actions[name] = getattr(importlib.import_module(module), attr)
+            return self._actions[name]
+
+
+solver_registry = Registry(
+    "solver",
+    CONFIG_DIR / "solvers.json",
+    {
+        "setup": "lib.solver_registry:setup_solver",
+    },
+)
+
+benchmark_registry = Registry(
+    "benchmark",
+    CONFIG_DIR / "benchmarks.json",
+    {
+        "setup": "lib.benchmark_registry:download_benchmark",
+    },
+)
@@ -1,7 +1,12 @@
 """Benchmark runner: execute solvers on benchmark instances."""
 
+import contextlib
 import csv
+import functools
+import hashlib
 import os
+import re
+import shlex
 import signal
 import subprocess
 import tempfile
@@ -9,60 +14,154 @@ import time
 from pathlib import Path
 
 from lib.format_converter import (
-    get_graph_info,
+    get_graph_info_fast,
     pace_gr_to_quickbb_cnf,
     parse_td_output,
 )
 from lib.solver_registry import get_solver, solver_dir
 
 
-def _build_run_command(solver, input_path, timeout):
-    """Build the actual shell command to run a solver."""
-    sdir = solver_dir(solver["name"])
-    mode = solver.get("run_mode", "stdin_stdout")
-    cmd_template = solver["run_command"]
+# Kept inside the checkout rather than the shared temp dir, so other users
+# can neither block the cache nor plant conversions in it.
+CNF_CACHE_DIR = Path(__file__).resolve().parent.parent / ".quickbb_cache"
+CNF_CACHE_MAX_FILES = 256
 
-    # Determine which command template to use
-    if solver["type"] == "heuristic" and "run_command_heuristic" in solver:
-        cmd_template = solver["run_command_heuristic"]
 
-    # Handle format conversion
-    converted_input = input_path
-    if solver.get("input_format") == "quickbb_cnf":
-        converted = tempfile.NamedTemporaryFile(suffix=".cnf", delete=False)
-        converted.close()
-        pace_gr_to_quickbb_cnf(input_path, converted.name)
-        converted_input = converted.name
+def _cached_quickbb_cnf(input_path):
+    """Return the path of a QuickBB CNF conversion of input_path.
 
-    # Substitute placeholders
-    input_dir = str(Path(input_path).parent)
-    instance_name = Path(input_path).stem
-
-    td_output = tempfile.NamedTemporaryFile(suffix=".td", delete=False)
-    td_output.close()
-
-    cmd = cmd_template.format(
-        input=converted_input,
-        input_dir=input_dir,
-        instance_name=instance_name,
-        output_td=td_output.name,
-        output_dir=tempfile.gettempdir(),
-        timeout=timeout,
-    )
+    Conversions are kept in CNF_CACHE_DIR, keyed by the input's path, mtime
+    and size, so repeated runs on the same instance convert it only once.
+    """
+    st = os.stat(input_path)
+    key = hashlib.blake2b(
+        f"{Path(input_path).resolve()}:{st.st_mtime_ns}:{st.st_size}".encode(),
+        digest_size=8,
+    ).hexdigest()
+    target = CNF_CACHE_DIR / f"{key}.cnf"
+    try:
+        os.utime(target)  # mark as recently used
+        return str(target)
+    except FileNotFoundError:
+        pass
+
+    CNF_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = tempfile.NamedTemporaryFile(dir=CNF_CACHE_DIR, suffix=".tmp", delete=False)
+    tmp.close()
+    try:
+        pace_gr_to_quickbb_cnf(input_path, tmp.name)
+        # Atomic, so parallel workers never see a half-written file
+        os.replace(tmp.name, target)
+    except BaseException:
+        os.unlink(tmp.name)
+        raise
+    _evict_cnf_cache()
+    return str(target)
 
-    return cmd, mode, sdir, td_output.name, converted_input
 
+def _quickbb_cnf(input_path, cleanup_files):
+    """Return a QuickBB CNF conversion of input_path.
 
-def run_solver(solver_name, input_path, timeout=300, use_heuristic=False, debug=False):
+    Uses the conversion cache when possible; if it cannot be used, converts
+    into a private temp file that is added to cleanup_files.
+    """
+    try:
+        return _cached_quickbb_cnf(input_path)
+    except OSError:
+        pass
+    tmp = tempfile.NamedTemporaryFile(suffix=".cnf", delete=False)
+    tmp.close()
+    cleanup_files.append(tmp.name)
+    pace_gr_to_quickbb_cnf(input_path, tmp.name)
+    return tmp.name
+
+
+def _evict_cnf_cache():
+    """Drop least recently used conversions beyond CNF_CACHE_MAX_FILES."""
+    entries = []
+    for path in CNF_CACHE_DIR.glob("*.cnf"):
+        try:
+            entries.append((path.stat().st_mtime_ns, path))
+        except FileNotFoundError:
+            pass
+    entries.sort()
+    for _, path in entries[:-CNF_CACHE_MAX_FILES]:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+_SHELL_CHARS = set("|&;>()$`*?[]~\n")
+_ENV_ASSIGNMENT = re.compile(r"[A-Za-z_][A-Za-z0-9_]*=")
+
+
+@functools.lru_cache(maxsize=64)
+def _split_template(template):
+    """Split a run command template into tokens for a launch without a shell.
+
+    Returns (env_tokens, argv_tokens, stdin_token), each still a template,
+    or None when the command needs /bin/sh. Leading VAR=value assignments
+    and a single trailing "< file" redirect are handled here.
+    """
+    if _SHELL_CHARS.intersection(template):
+        return None
+    head, redirect, stdin_part = template.partition("<")
+    try:
+        tokens = shlex.split(head)
+        stdin_tokens = shlex.split(stdin_part)
+    except ValueError:
+        return None
+    if redirect and len(stdin_tokens) != 1:
+        return None
+    env_tokens = []
+    while tokens and _ENV_ASSIGNMENT.match(tokens[0]):
+        env_tokens.append(tokens.pop(0))
+    if not tokens:
+        return None
+    return tuple(env_tokens), tuple(tokens), stdin_tokens[0] if redirect else None
+
+
+def _launch_spec(cmd_template, fields):
+    """Return (popen kwargs, stdin redirect path) for running a solver.
+
+    Simple templates are tokenized once and each token rendered on its own,
+    so the solver is exec'd directly instead of through a /bin/sh fork;
+    anything else runs the rendered command with shell=True as before.
+    """
+    split = _split_template(cmd_template)
+    if split is None:
+        return {"args": cmd_template.format(**fields), "shell": True}, None
+    env_tokens, argv_tokens, stdin_token = split
+    popen_kwargs = {"args": [t.format(**fields) for t in argv_tokens]}
+    if env_tokens:
+        env = dict(os.environ)
+        for token in env_tokens:
+            key, value = token.format(**fields).split("=", 1)
+            env[key] = value
+        popen_kwargs["env"] = env
+    stdin_path = stdin_token.format(**fields) if stdin_token else None
+    return popen_kwargs, stdin_path
+
+
+def _decode(data):
+    """Decode captured solver output in one pass, tolerating non-UTF-8 bytes."""
+    return data.decode("utf-8", "replace") if data else ""
+
+
+def run_solver(
+    solver_name, input_path, timeout=300, use_heuristic=False, debug=False, graph_info=None
+):
     """Run a solver on a single instance.
 
     Returns dict with keys:
       solver, instance, vertices, edges, treewidth, time_sec, status, memory_mb
     When debug=True, also includes _debug dict with command, cwd, returncode,
-    stderr, and stdout_raw.
+    stderr, and stdout_raw. graph_info ({"vertices", "edges"}) may be passed
+    in when the caller already knows it, to skip reading the input header.
     """
     solver = get_solver(solver_name)
-    info = get_graph_info(input_path)
+    info = graph_info or get_graph_info_fast(input_path)
     instance_name = Path(input_path).stem
 
     result = {
@@ -88,11 +187,7 @@ def run_solver(solver_name, input_path, timeout=300, use_heuristic=False, debug=
     converted_input = input_path
     cleanup_files = []
     if solver.get("input_format") == "quickbb_cnf":
-        tmp = tempfile.NamedTemporaryFile(suffix=".cnf", delete=False)
-        tmp.close()
-        pace_gr_to_quickbb_cnf(input_path, tmp.name)
-        converted_input = tmp.name
-        cleanup_files.append(tmp.name)
+        converted_input = _quickbb_cnf(input_path, cleanup_files)
 
     td_file = tempfile.NamedTemporaryFile(suffix=".td", delete=False)
     td_file.close()
@@ -102,17 +197,19 @@ def run_solver(solver_name, input_path, timeout=300, use_heuristic=False, debug=
     iname = Path(input_path).stem
     converted_input = str(Path(converted_input).resolve())
 
-    cmd = cmd_template.format(
-        input=converted_input,
-        input_dir=input_dir,
-        instance_name=iname,
-        output_td=td_file.name,
-        output_dir=tempfile.gettempdir(),
-        timeout=timeout,
-    )
+    fields = {
+        "input": converted_input,
+        "input_dir": input_dir,
+        "instance_name": iname,
+        "output_td": td_file.name,
+        "output_dir": tempfile.gettempdir(),
+        "timeout": timeout,
+    }
+    launch, redirect_path = _launch_spec(cmd_template, fields)
+    stdin_path = redirect_path or input_path
 
     _debug = {
-        "command": cmd,
+        "command": cmd_template.format(**fields),
         "cwd": str(sdir),
         "returncode": None,
         "stderr": "",
@@ -125,33 +222,29 @@ def run_solver(solver_name, input_path, timeout=300, use_heuristic=False, debug=
         stderr_text = ""
 
         if mode == "stdin_stdout":
-            with open(input_path) as fin:
+            with open(stdin_path) as fin:
                 proc = subprocess.run(
-                    cmd,
-                    shell=True,
+                    **launch,
                     cwd=str(sdir),
                     stdin=fin,
                     capture_output=True,
-                    text=True,
                     timeout=timeout,
                 )
-            stdout = proc.stdout
-            stderr_text = proc.stderr
+            stdout = _decode(proc.stdout)
+            stderr_text = _decode(proc.stderr)
             if _debug:
                 _debug["returncode"] = proc.returncode
 
         elif mode == "stdin_stdout_signal":
             # Heuristic solver: run for `timeout` seconds, then send SIGTERM
-            with open(input_path) as fin:
+            with open(stdin_path) as fin:
                 proc = subprocess.Popen(
-                    cmd,
-                    shell=True,
+                    **launch,
                     cwd=str(sdir),
                     stdin=fin,
                     stdout=subprocess.PIPE,
                     stderr=subprocess.PIPE,
-                    text=True,
-                    preexec_fn=os.setsid,
+                    start_new_session=True,
                 )
             try:
                 stdout, stderr_text = proc.communicate(timeout=timeout)
@@ -163,48 +256,48 @@ def run_solver(solver_name, input_path, timeout=300, use_heuristic=False, debug=
                 except subprocess.TimeoutExpired:
                     os.killpg(os.getpgid(proc.pid), signal.SIGKILL)
                     stdout, stderr_text = proc.communicate(timeout=5)
+            stdout, stderr_text = _decode(stdout), _decode(stderr_text)
             if _debug:
                 _debug["returncode"] = proc.returncode
 
         elif mode == "file":
-            proc = subprocess.run(
-                cmd,
-                shell=True,
-                cwd=str(sdir),
-                capture_output=True,
-                text=True,
-                timeout=timeout,
-            )
-            stdout = proc.stdout
-            stderr_text = proc.stderr
+            stdin_cm = open(redirect_path) if redirect_path else contextlib.nullcontext()
+            with stdin_cm as fin:
+                proc = subprocess.run(
+                    **launch,
+                    cwd=str(sdir),
+                    stdin=fin,
+                    capture_output=True,
+                    timeout=timeout,
+                )
+            stdout = _decode(proc.stdout)
+            stderr_text = _decode(proc.stderr)
             if _debug:
                 _debug["returncode"] = proc.returncode
             # Try reading output from file
             if os.path.exists(td_file.name) and os.path.getsize(td_file.name) > 0:
-                with open(td_file.name) as f:
+                with open(td_file.name, errors="replace") as f:
                     stdout = f.read()
             # Also check for solver-specific output files (e.g. twalgor-rtw .twc)
             for ext in [".twc", ".td"]:
                 alt = os.path.join(tempfile.gettempdir(), iname + ext)
                 if os.path.exists(alt) and os.path.getsize(alt) > 0:
-                    with open(alt) as f:
+                    with open(alt, errors="replace") as f:
                         stdout = f.read()
                     cleanup_files.append(alt)
                     break
 
         else:
-            with open(input_path) as fin:
+            with open(stdin_path) as fin:
                 proc = subprocess.run(
-                    cmd,
-                    shell=True,
+                    **launch,
                     cwd=str(sdir),
                     stdin=fin,
                     capture_output=True,
-                    text=True,
                     timeout=timeout,
                 )
-            stdout = proc.stdout
-            stderr_text = proc.stderr
+            stdout = _decode(proc.stdout)
+            stderr_text = _decode(proc.stderr)
             if _debug:
                 _debug["returncode"] = proc.returncode
 
@@ -273,7 +366,6 @@ def write_csv(results, output_path):
         "memory_mb",
     ]
     with open(output_path, "w", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        for r in results:
-            writer.writerow({k: r.get(k) for k in fieldnames})
+        writer = csv.writer(f)
+        writer.writerow(fieldnames)
+        writer.writerows([r.get(k) for k in fieldnames] for r in results)
@@ -1,35 +1,52 @@
 """Solver registry: download, build, and manage treewidth solvers."""
 
-import json
+import functools
 import os
 import subprocess
 import shutil
+import threading
 from pathlib import Path
 
+from lib.download_cache import clone_repo
+from lib.registries import solver_registry
+
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 SOLVERS_DIR = BASE_DIR / "solvers"
-CONFIG_FILE = BASE_DIR / "config" / "solvers.json"
+CONFIG_FILE = solver_registry.config_file
+
+# Keeps multi-line build failure reports from interleaving when solvers
+# are set up concurrently.
+_print_lock = threading.Lock()
 
 
 def load_solvers():
-    with open(CONFIG_FILE) as f:
-        return json.load(f)
+    return solver_registry.entries()
 
 
 def get_solver(name):
-    for s in load_solvers():
-        if s["name"] == name:
-            return s
-    raise ValueError(f"Unknown solver: {name}")
+    return solver_registry.get(name)
 
 
 def solver_dir(name):
     return SOLVERS_DIR / name
 
 
+@functools.lru_cache(maxsize=1)
+def _list_dir(mtime_ns):
+    return frozenset(os.listdir(SOLVERS_DIR))
+
+
+def _installed_names():
+    """Names present in solvers/, listed once per directory version."""
+    try:
+        return _list_dir(SOLVERS_DIR.stat().st_mtime_ns)
+    except FileNotFoundError:
+        return frozenset()
+
+
 def is_installed(name):
-    return solver_dir(name).exists()
+    return name in _installed_names()
 
 
 def check_dependency(lang):
@@ -50,7 +67,7 @@ def check_dependency(lang):
         return False
 
 
-def download_solver(solver):
+def download_solver(solver, cache_dir=None):
     name = solver["name"]
     dest = solver_dir(name)
     if dest.exists():
@@ -58,32 +75,47 @@ def download_solver(solver):
         return True
     print(f"  [{name}] Cloning {solver['repo']} ...")
     try:
-        subprocess.run(
-            ["git", "clone", "--depth", "1", solver["repo"], str(dest)],
-            check=True,
-            capture_output=True,
-            text=True,
-        )
+        clone_repo(solver["repo"], dest, cache_dir)
         return True
     except subprocess.CalledProcessError as e:
         print(f"  [{name}] Clone failed: {e.stderr.strip()}")
         return False
 
 
-def build_solver(solver):
+def _build_env(jobs=None, ccache=False):
+    """Environment for build steps: parallel make and optional ccache.
+
+    Adds to the caller's MAKEFLAGS and wraps whatever CC/CXX is already
+    set rather than replacing them.
+    """
+    env = dict(os.environ)
+    if jobs:
+        # MAKEFLAGS also reaches makes started from build.sh/configure scripts
+        env["MAKEFLAGS"] = f"{env.get('MAKEFLAGS', '')} -j{jobs}".lstrip()
+    if ccache:
+        for var, default in (("CC", "cc"), ("CXX", "c++")):
+            compiler = env.get(var, default)
+            if not compiler.startswith("ccache "):
+                env[var] = f"ccache {compiler}"
+    return env
+
+
+def build_solver(solver, jobs=None, ccache=False):
     name = solver["name"]
     dest = solver_dir(name)
     if not dest.exists():
         print(f"  [{name}] Not downloaded yet")
         return False
     print(f"  [{name}] Building ...")
+    env = _build_env(jobs, ccache)
     for step in solver.get("build_steps", []):
-        print(f"    $ {step}")
+        print(f"  [{name}] $ {step}")
         try:
             subprocess.run(
                 step,
                 shell=True,
                 cwd=str(dest),
+                env=env,
                 check=True,
                 capture_output=True,
                 text=True,
@@ -92,38 +124,40 @@ def build_solver(solver):
         except subprocess.CalledProcessError as e:
             stderr_lines = (e.stderr or "").strip().splitlines()
             stdout_lines = (e.stdout or "").strip().splitlines()
-            print(f"    Build step failed (exit code {e.returncode}):")
+            report = [f"  [{name}] Build step failed (exit code {e.returncode}):"]
             if stderr_lines:
                 tail = stderr_lines[-30:]
                 if len(stderr_lines) > 30:
-                    print(f"    ... ({len(stderr_lines) - 30} lines omitted)")
+                    report.append(f"    ... ({len(stderr_lines) - 30} lines omitted)")
                 for line in tail:
-                    print(f"    [stderr] {line}")
+                    report.append(f"    [stderr] {line}")
             if stdout_lines:
                 tail = stdout_lines[-15:]
                 if len(stdout_lines) > 15:
-                    print(f"    ... ({len(stdout_lines) - 15} lines omitted)")
+                    report.append(f"    ... ({len(stdout_lines) - 15} lines omitted)")
                 for line in tail:
-                    print(f"    [stdout] {line}")
+                    report.append(f"    [stdout] {line}")
             if not stderr_lines and not stdout_lines:
-                print(f"    (no output)")
+                report.append(f"    (no output)")
+            with _print_lock:
+                print("\n".join(report))
             return False
         except subprocess.TimeoutExpired:
-            print(f"    Build step timed out")
+            print(f"  [{name}] Build step timed out")
             return False
     print(f"  [{name}] Build successful")
     return True
 
 
-def setup_solver(solver):
+def setup_solver(solver, cache_dir=None, jobs=None, ccache=False):
     name = solver["name"]
     lang = solver["language"]
     if not check_dependency(lang):
         print(f"  [{name}] Skipping: {lang} not found")
         return False
-    if not download_solver(solver):
+    if not download_solver(solver, cache_dir):
         return False
-    return build_solver(solver)
+    return build_solver(solver, jobs, ccache)
 
 
 def setup_all():
@@ -137,4 +171,5 @@ def setup_all():
 
 
 def list_installed():
-    return [s["name"] for s in load_solvers() if is_installed(s["name"])]
+    installed = _installed_names()
+    return [s["name"] for s in load_solvers() if s["name"] in installed]
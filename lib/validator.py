@@ -6,7 +6,7 @@ Checks the three conditions of a valid tree decomposition:
 3. For every vertex v, the bags containing v form a connected subtree.
 """
 
-from collections import defaultdict, deque
+from collections import defaultdict
 from lib.format_converter import read_pace_gr
 
 
@@ -52,49 +52,49 @@ def validate(graph_path, td_text):
     if not bags:
         return False, -1, ["No bags found in decomposition"]
 
+    # One pass over the bags serves all three checks
+    vertex_to_bags = defaultdict(set)
+    for bag_id, vset in bags.items():
+        for v in vset:
+            vertex_to_bags[v].add(bag_id)
+
     # Check 1: every vertex appears in at least one bag
-    all_bag_vertices = set()
-    for vset in bags.values():
-        all_bag_vertices.update(vset)
     for v in range(1, n + 1):
-        if v not in all_bag_vertices:
+        if v not in vertex_to_bags:
             errors.append(f"Vertex {v} not in any bag")
 
-    # Check 2: every edge is covered
+    # Check 2: every edge is covered, i.e. u and v share at least one bag
+    no_bags = frozenset()
     for u, v in edges:
-        found = False
-        for vset in bags.values():
-            if u in vset and v in vset:
-                found = True
-                break
-        if not found:
+        if vertex_to_bags.get(u, no_bags).isdisjoint(vertex_to_bags.get(v, no_bags)):
             errors.append(f"Edge ({u},{v}) not covered by any bag")
 
-    # Check 3: connected subtree property
+    # Check 3: connected subtree property. Root the tree once; the bags
+    # containing v then form a subtree iff exactly one of them has no
+    # parent, or a parent bag that does not contain v.
     adj = defaultdict(set)
     for a, b in tree_edges:
         adj[a].add(b)
         adj[b].add(a)
 
-    vertex_to_bags = defaultdict(set)
-    for bag_id, vset in bags.items():
-        for v in vset:
-            vertex_to_bags[v].add(bag_id)
+    parent = {}
+    for root in bags:
+        if root in parent:
+            continue
+        parent[root] = None
+        stack = [root]
+        while stack:
+            curr = stack.pop()
+            for nb in adj[curr]:
+                if nb not in parent:
+                    parent[nb] = curr
+                    stack.append(nb)
 
-    for v in all_bag_vertices:
-        v_bags = vertex_to_bags[v]
+    for v, v_bags in vertex_to_bags.items():
         if len(v_bags) <= 1:
             continue
-        start = next(iter(v_bags))
-        visited = {start}
-        queue = deque([start])
-        while queue:
-            curr = queue.popleft()
-            for nb in adj[curr]:
-                if nb not in visited and nb in v_bags:
-                    visited.add(nb)
-                    queue.append(nb)
-        if visited != v_bags:
+        tops = sum(1 for bag_id in v_bags if parent[bag_id] not in v_bags)
+        if tops != 1:
             errors.append(f"Bags for vertex {v} are not connected")
 
     treewidth = max(len(vset) for vset in bags.values()) - 1
@@ -12,6 +12,7 @@ from lib.benchmark_registry import (
     list_installed as list_installed_benchmarks,
     load_benchmarks,
 )
+from lib.format_converter import get_graph_info_fast
 from lib.runner import run_solver, write_csv
 from lib.solver_registry import (
     get_solver,
@@ -50,8 +51,10 @@ def resolve_benchmarks(names):
 
 def _run_one(args):
     """Wrapper for process pool."""
-    solver_name, instance_path, timeout, bench_name, use_heuristic, debug = args
-    result = run_solver(solver_name, instance_path, timeout, use_heuristic, debug=debug)
+    solver_name, instance_path, timeout, bench_name, use_heuristic, debug, info = args
+    result = run_solver(
+        solver_name, instance_path, timeout, use_heuristic, debug=debug, graph_info=info
+    )
     result["benchmark_set"] = bench_name
     return result
 
@@ -172,16 +175,29 @@ def main():
         print("Error: no installed benchmarks found")
         sys.exit(1)
 
-    # Build work items
+    # Build work items. Graph sizes are read once per instance here rather
+    # than by every solver job that runs on it.
     work = []
+    graph_info = {}
     for bench_name in benchmarks:
         instances = list_instances(bench_name)
         if args.max_instances:
             instances = instances[: args.max_instances]
+        for inst in instances:
+            if inst not in graph_info:
+                graph_info[inst] = get_graph_info_fast(inst)
         for solver_name in solvers:
             for inst in instances:
                 work.append(
-                    (solver_name, inst, args.timeout, bench_name, args.heuristic, args.debug)
+                    (
+                        solver_name,
+                        inst,
+                        args.timeout,
+                        bench_name,
+                        args.heuristic,
+                        args.debug,
+                        graph_info[inst],
+                    )
                 )
 
     total = len(work)
@@ -195,7 +211,7 @@ def main():
 
     if args.jobs == 1:
         for item in work:
-            solver_name, inst, _, bench_name, _, _ = item
+            solver_name, inst, _, bench_name, _, _, _ = item
             inst_name = Path(inst).stem
             done += 1
             print(
@@ -214,7 +230,7 @@ def main():
             futures = {pool.submit(_run_one, item): item for item in work}
             for future in as_completed(futures):
                 item = futures[future]
-                solver_name, inst, _, bench_name, _, _ = item
+                solver_name, inst, _, bench_name, _, _, _ = item
                 inst_name = Path(inst).stem
                 done += 1
                 r = future.result()
@@ -2,14 +2,64 @@
 """Setup script: download and build treewidth solvers and benchmark instances."""
 
 import argparse
+import functools
+import os
+import shutil
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-from lib.solver_registry import load_solvers, setup_solver, setup_all as setup_all_solvers
-from lib.benchmark_registry import (
-    load_benchmarks,
-    download_benchmark,
-    setup_all as setup_all_benchmarks,
-)
+# Only the lazy registries are imported up front; the download/build code is
+# imported through Registry.action() when a setup is actually requested.
+from lib.registries import benchmark_registry, solver_registry
+
+# Setup is dominated by git clones and compiler subprocesses, so a thread
+# pool is enough to overlap them.
+MAX_SETUP_WORKERS = 8
+
+
+def _run_setups(jobs):
+    """Run (kind, func, entry) jobs on one thread pool.
+
+    Each job's status is printed as soon as it finishes; a job that raises
+    counts as failed. Returns a list of (kind, name, ok) in completion order.
+    Jobs run concurrently, so their own messages carry a [name] prefix
+    rather than being grouped under a banner.
+    """
+    results = []
+    if not jobs:
+        return results
+    width = max(len(entry["name"]) for _, _, entry in jobs)
+    with ThreadPoolExecutor(max_workers=min(MAX_SETUP_WORKERS, len(jobs))) as pool:
+        futures = {pool.submit(func, entry): (kind, entry) for kind, func, entry in jobs}
+        for future in as_completed(futures):
+            kind, entry = futures[future]
+            try:
+                ok = future.result()
+            except Exception as e:
+                # Keep going so the remaining statuses and the summary still print
+                print(f"  [{entry['name']}] Error: {e}")
+                ok = False
+            results.append((kind, entry["name"], ok))
+            print(f"  [{kind}] {entry['name']:<{width}} {'OK' if ok else 'FAILED'}", flush=True)
+    return results
+
+
+def _format_listing(title, entries, fields, width=None):
+    """Lines for --list: a title, then one row per entry.
+
+    fields are (key, template) pairs rendered as columns padded to their
+    widest value, followed by the description. With a width, longer rows
+    are cut to fit.
+    """
+    widths = [max((len(str(e[key])) for e in entries), default=0) for key, _ in fields]
+    lines = [f"=== {title} ==="]
+    for e in entries:
+        cells = [tmpl.format(str(e[key]).ljust(w)) for (key, tmpl), w in zip(fields, widths)]
+        line = f"  {' '.join(cells)}  {e['description']}"
+        if width and len(line) > width:
+            line = line[: max(width - 3, 0)] + "..."
+        lines.append(line)
+    return lines
 
 
 def main():
@@ -40,71 +90,104 @@ def main():
     parser.add_argument(
         "--list", action="store_true", help="List available solvers and benchmarks"
     )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=None,
+        help="Reuse git clones kept in this directory instead of re-downloading "
+        "(default: .download_cache when TW_SETUP_CACHE=1, otherwise off)",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="Parallel compile jobs per solver build, passed to make. Several solvers "
+        "may build at once (default: CPU count divided by the number of concurrent builds)",
+    )
+    parser.add_argument(
+        "--ccache",
+        dest="ccache",
+        action="store_true",
+        default=None,
+        help="Compile C/C++ solvers through ccache (default: on if ccache is installed)",
+    )
+    parser.add_argument("--no-ccache", dest="ccache", action="store_false", help="Do not use ccache")
     args = parser.parse_args()
 
+    # Reject unknown names before any clone or build starts
+    unknown = [f"Unknown solver: {n}" for n in args.solver if n not in solver_registry.keys()]
+    unknown += [
+        f"Unknown benchmark: {n}" for n in args.benchmark if n not in benchmark_registry.keys()
+    ]
+    if unknown:
+        print("\n".join(unknown))
+        sys.exit(2)
+
     if args.list:
-        print("=== Available Solvers ===")
-        for s in load_solvers():
-            print(f"  {s['name']:25s} [{s['type']:10s}] {s['language']:6s}  {s['description']}")
-        print()
-        print("=== Available Benchmarks ===")
-        for b in load_benchmarks():
-            print(f"  {b['name']:25s} {b['description']}")
+        solvers, benchmarks = solver_registry.entries(), benchmark_registry.entries()
+        # Only cut long descriptions when a human is looking at a terminal
+        width = shutil.get_terminal_size().columns if sys.stdout.isatty() else None
+        lines = _format_listing(
+            "Available Solvers",
+            solvers,
+            [("name", "{}"), ("type", "[{}]"), ("language", "{}")],
+            width,
+        )
+        lines.append("")
+        lines += _format_listing("Available Benchmarks", benchmarks, [("name", "{}")], width)
+        sys.stdout.write("\n".join(lines) + "\n")
         return
 
     if not (args.all or args.solver or args.benchmark or args.solvers_only or args.benchmarks_only):
         parser.print_help()
         sys.exit(1)
 
-    solver_results = {}
-    bench_results = {}
+    from lib.download_cache import DEFAULT_CACHE_DIR, cache_enabled_by_env
+
+    cache_dir = args.cache_dir
+    if cache_dir is None and cache_enabled_by_env():
+        cache_dir = DEFAULT_CACHE_DIR
+    ccache = args.ccache
+    if ccache is None:
+        ccache = shutil.which("ccache") is not None
 
-    # Setup solvers
     if args.all or args.solvers_only:
-        print("=" * 60)
-        print("Setting up ALL solvers")
-        print("=" * 60)
-        solver_results = setup_all_solvers()
-    elif args.solver:
-        solvers = load_solvers()
-        solver_map = {s["name"]: s for s in solvers}
-        for name in args.solver:
-            if name not in solver_map:
-                print(f"Unknown solver: {name}")
-                continue
-            print(f"\n--- Setting up solver: {name} ---")
-            solver_results[name] = setup_solver(solver_map[name])
-
-    # Setup benchmarks
+        solvers = list(solver_registry.entries())
+    else:
+        solvers = [solver_registry.get(name) for name in dict.fromkeys(args.solver)]
     if args.all or args.benchmarks_only:
-        print("\n" + "=" * 60)
-        print("Downloading ALL benchmarks")
-        print("=" * 60)
-        bench_results = setup_all_benchmarks()
-    elif args.benchmark:
-        benchmarks = load_benchmarks()
-        bench_map = {b["name"]: b for b in benchmarks}
-        for name in args.benchmark:
-            if name not in bench_map:
-                print(f"Unknown benchmark: {name}")
-                continue
-            print(f"\n--- Downloading benchmark: {name} ---")
-            bench_results[name] = download_benchmark(bench_map[name])
-
-    # Summary
+        benchmarks = list(benchmark_registry.entries())
+    else:
+        benchmarks = [benchmark_registry.get(name) for name in dict.fromkeys(args.benchmark)]
+
+    make_jobs = args.jobs
+    if make_jobs is None and solvers:
+        # Split the CPUs between the builds that may run concurrently
+        make_jobs = max(1, (os.cpu_count() or 1) // min(MAX_SETUP_WORKERS, len(solvers)))
+
+    # Solver builds and benchmark clones share one pool, so network-bound
+    # downloads overlap with compiler-bound builds instead of waiting for them.
+    setup_solver = functools.partial(
+        solver_registry.action("setup"), cache_dir=cache_dir, jobs=make_jobs, ccache=ccache
+    )
+    download_benchmark = functools.partial(
+        benchmark_registry.action("setup"), cache_dir=cache_dir
+    )
+    jobs = [("solver", setup_solver, s) for s in solvers]
+    jobs += [("benchmark", download_benchmark, b) for b in benchmarks]
+
+    print("=" * 60)
+    print(f"Setting up {len(solvers)} solver(s) and {len(benchmarks)} benchmark set(s)")
+    print("=" * 60)
+    results = _run_setups(jobs)
+
+    failed = [f"{name} ({kind})" for kind, name, ok in results if not ok]
     print("\n" + "=" * 60)
-    print("SUMMARY")
+    print(f"SUMMARY: {len(results) - len(failed)} OK, {len(failed)} FAILED")
+    if failed:
+        print("Failed: " + ", ".join(failed))
     print("=" * 60)
-    if solver_results:
-        print("\nSolvers:")
-        for name, ok in solver_results.items():
-            status = "OK" if ok else "FAILED"
-            print(f"  {name:25s} {status}")
-    if bench_results:
-        print("\nBenchmarks:")
-        for name, ok in bench_results.items():
-            status = "OK" if ok else "FAILED"
-            print(f"  {name:25s} {status}")
+    sys.exit(1 if failed else 0)
 
 
 if __name__ == "__main__":